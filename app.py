@@ -1,25 +1,40 @@
 import streamlit as st
 import yfinance as yf
+from curl_cffi import requests as curl_requests
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import ollama
-import tempfile
 import base64
-import os
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+import io
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER
 from datetime import datetime, timedelta
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import time
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
+# orjson serializes numpy-backed figures far faster than the stdlib json encoder
+pio.json.config.default_engine = 'orjson'
 
-# Cached data fetching with retry logic
-@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour
-def fetch_stock_data(ticker, start_date, end_date, max_retries=3):
-    """Fetch stock data with retry logic and rate limit handling"""
+
+@st.cache_resource
+def get_http_session():
+    """Shared HTTP session (and Yahoo cookie/crumb) used by every Yahoo Finance request"""
+    # yfinance only accepts curl_cffi (or plain requests) sessions; curl_cffi is what it uses itself.
+    # curl_cffi keeps connections per thread, so they are reused within a fetch, not across clicks
+    return curl_requests.Session(impersonate="chrome")
+
+
+def _download_with_retry(tickers, start_date, end_date, max_retries=3, **kwargs):
+    """Run yf.download with retry logic and rate limit handling; returns (df, error)"""
     for attempt in range(max_retries):
         try:
             # Add delay between attempts
@@ -27,17 +42,14 @@ def fetch_stock_data(ticker, start_date, end_date, max_retries=3):
                 time.sleep(2 ** attempt)  # Exponential backoff: 2s, 4s, 8s
             
             df = yf.download(
-                ticker, 
+                tickers, 
                 start=start_date, 
                 end=end_date, 
                 progress=False,
-                auto_adjust=True  # Fix the FutureWarning
+                auto_adjust=True,  # Fix the FutureWarning
+                session=get_http_session(),
+                **kwargs
             )
-            
-            # Flatten MultiIndex columns
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = ['_'.join([str(i) for i in col]).strip().rstrip('_') for col in df.columns.values]
-            
             return df, None  # Success
             
         except Exception as e:
@@ -53,52 +65,516 @@ def fetch_stock_data(ticker, start_date, end_date, max_retries=3):
     return None, "❌ Failed to fetch data after multiple attempts."
 
 
+def _normalize_ohlcv(df):
+    """Normalizes one ticker's OHLCV frame (flat field-name columns): clean rows, int64 volume"""
+    # Prices stay float64 so displayed cents and exports are exact; charts downcast their own copies
+    price_cols = [c for c in df.columns if not c.startswith('Volume')]
+    vol_cols = [c for c in df.columns if c.startswith('Volume')]
+    # Rows Yahoo returns without prices are dropped: the running-sum indicators would
+    # otherwise carry a single NaN into every later bar
+    df = df.dropna(subset=price_cols)
+    df[vol_cols] = df[vol_cols].fillna(0).astype(np.int64)
+    return df
+
+
+# Cached data fetching with retry logic
+@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour
+def fetch_stock_data(ticker, start_date, end_date, max_retries=3):
+    """Fetch stock data with retry logic and rate limit handling"""
+    # threads=False keeps the request on the calling worker; yfinance would otherwise
+    # spawn an extra thread even for one ticker
+    df, error = _download_with_retry(ticker, start_date, end_date, max_retries, threads=False)
+    if error:
+        return None, error
+    
+    # Single-ticker downloads come back as (Price, Ticker) columns; keep just the field names
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    return _normalize_ohlcv(df), None
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_stock_data_multi(tickers, start_date, end_date, max_retries=3):
+    """Fetch several tickers in one batched request and split them into per-ticker frames"""
+    df, error = _download_with_retry(
+        list(tickers), start_date, end_date, max_retries, group_by='ticker', threads=True
+    )
+    if error:
+        return None, error
+    
+    frames = {}
+    for ticker in tickers:
+        if isinstance(df.columns, pd.MultiIndex):
+            if ticker not in df.columns.get_level_values(0):
+                continue
+            frame = df[ticker]
+        else:
+            frame = df
+        # Each ticker gets the same cleanup as a single fetch_stock_data frame
+        frames[ticker] = _normalize_ohlcv(frame)
+    
+    return frames, None
+
+
 @st.cache_data(ttl=3600, show_spinner=False)
 def fetch_ticker_info(ticker):
     """Fetch ticker info with error handling"""
     try:
-        stock = yf.Ticker(ticker)
+        stock = yf.Ticker(ticker, session=get_http_session())
         return stock.info
     except:
         return {}
 
 
+def _running_mean(csum, window):
+    """Trailing-window mean from a zero-prefixed cumulative sum, NaN-padded like pandas rolling."""
+    mean = np.full(len(csum) - 1, np.nan)
+    if len(mean) >= window:
+        mean[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return mean
+
+
+def _rsi_reversion_signal(rsi, oversold=30, overbought=70):
+    """Mean-reversion signal: 1 below the oversold line, -1 above the overbought line, else 0."""
+    # Boolean masks reinterpreted as int8 need no cast copies; warm-up NaNs compare False
+    return (rsi < oversold).view(np.int8) - (rsi > overbought).view(np.int8)
+
+
+def _crossover_signal(fast, slow):
+    """Long/flat signal: 1 while the fast line (short SMA, MACD) is above the slow one."""
+    return (fast > slow).view(np.int8)
+
+
+def _rolling_mean_std(values, window):
+    """Trailing-window mean and sample std from running sums, NaN-padded like pandas rolling."""
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if len(values) >= window:
+        # Offsetting by the first value keeps the sum of squares small enough to avoid cancellation
+        shifted = values - values[0]
+        csum = np.cumsum(np.concatenate(([0.0], shifted)))
+        csum_sq = np.cumsum(np.concatenate(([0.0], shifted * shifted)))
+        sum_w = csum[window:] - csum[:-window]
+        sum_sq_w = csum_sq[window:] - csum_sq[:-window]
+        mean[window - 1:] = sum_w / window + values[0]
+        var = (sum_sq_w - sum_w * sum_w / window) / (window - 1)
+        std[window - 1:] = np.sqrt(np.maximum(var, 0.0))
+    return mean, std
+
+
+def _ewma(values, span, min_periods=0):
+    """Recursive (adjust=False) exponential moving average of a numpy array."""
+    # copy=False wraps the buffer as-is; pandas 3 would otherwise copy it first
+    return pd.Series(values, copy=False).ewm(span=span, adjust=False, min_periods=min_periods).mean().to_numpy()
+
+
+def _rsi(close, period=14):
+    """Wilder-smoothed RSI for a float64 close array."""
+    delta = np.diff(close, prepend=np.nan)
+    # Gains and losses are smoothed side by side in a single compiled ewm pass
+    moves = np.column_stack((np.maximum(delta, 0.0), np.maximum(-delta, 0.0)))
+    smoothed = pd.DataFrame(moves, copy=False).ewm(alpha=1/period, adjust=False, min_periods=period).mean().to_numpy()
+    avg_gain, avg_loss = smoothed[:, 0], smoothed[:, 1]
+    # 100 - 100 / (1 + gain/loss) is 100 * gain / (gain + loss): one division, no RS array.
+    # A window with no losses reads 100, as in Wilder's definition and TradingView
+    rsi = np.full(len(close), 100.0)
+    np.divide(100 * avg_gain, avg_gain + avg_loss, out=rsi, where=avg_loss != 0)
+    return rsi
+
+
+# Leading rows before every indicator is defined: the 9-bar MACD signal
+# only starts once the 26-bar slow EMA has a value
+_INDICATOR_WARMUP = 26 + 9 - 2
+
+
+def _macd(close):
+    """MACD line, signal line and histogram (12/26/9) for a float64 close array."""
+    macd = _ewma(close, 12, min_periods=12) - _ewma(close, 26, min_periods=26)
+    signal = _ewma(macd, 9, min_periods=9)
+    return macd, signal, macd - signal
+
+
+def _indicator_arrays(close):
+    """Computes SMA, RSI, MACD and Bollinger Band arrays from a single float64 close array."""
+    # 1. SMA 20/50/200 from one shared running sum
+    csum = np.cumsum(np.concatenate(([0.0], close)))
+    sma_20, sma_50, sma_200 = (_running_mean(csum, period) for period in (20, 50, 200))
+    
+    # 2. RSI (Relative Strength Index) with Wilder's smoothing
+    rsi = _rsi(close)
+    
+    # 3. MACD (Moving Average Convergence Divergence)
+    macd, macd_signal, macd_hist = _macd(close)
+    
+    # 4. Bollinger Bands (20 period, 2 stdev)
+    bb_middle, std = _rolling_mean_std(close, 20)
+    std *= 2  # in place, so each band costs one array
+    bb_upper = bb_middle + std
+    bb_lower = bb_middle - std
+    
+    return sma_20, sma_50, sma_200, rsi, macd, macd_signal, macd_hist, bb_middle, bb_upper, bb_lower
+
+
+def _frame_fingerprint(df):
+    """Cheap cache key for a price frame: its span, shape, columns and first/last rows."""
+    # The first row catches split/dividend re-adjustments, the last one new bars
+    edge_rows = df.iloc[[0, -1]].to_numpy().tobytes()
+    return (df.index[0], df.index[-1], len(df), tuple(df.columns), edge_rows)
+
+
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
 def calculate_technical_indicators(df, close_col):
-    """Calculates RSI, MACD, and Bollinger Bands on a DataFrame."""
-    df_copy = df.copy()
-    
-    # 1. RSI (Relative Strength Index)
-    delta = df_copy[close_col].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss.replace(0, np.nan) 
-    df_copy['RSI'] = 100 - (100 / (1 + rs))
-    
-    # 2. MACD (Moving Average Convergence Divergence)
-    exp1 = df_copy[close_col].ewm(span=12, adjust=False).mean()
-    exp2 = df_copy[close_col].ewm(span=26, adjust=False).mean()
-    df_copy['MACD'] = exp1 - exp2
-    df_copy['MACD_Signal'] = df_copy['MACD'].ewm(span=9, adjust=False).mean()
-    df_copy['MACD_Hist'] = df_copy['MACD'] - df_copy['MACD_Signal']
-    
-    # 3. Bollinger Bands (20 period, 2 stdev)
-    df_copy['BB_Middle'] = df_copy[close_col].rolling(window=20).mean()
-    std = df_copy[close_col].rolling(window=20).std()
-    df_copy['BB_Upper'] = df_copy['BB_Middle'] + (2 * std)
-    df_copy['BB_Lower'] = df_copy['BB_Middle'] - (2 * std)
-    
-    return df_copy
+    """Calculates SMAs, RSI, MACD, and Bollinger Bands on a DataFrame."""
+    close = df[close_col].to_numpy(dtype=np.float64)
+    names = ('SMA_20', 'SMA_50', 'SMA_200', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist', 'BB_Middle', 'BB_Upper', 'BB_Lower')
+    indicators = {
+        name: arr.astype(np.float32)
+        for name, arr in zip(names, _indicator_arrays(close))
+    }
+    
+    # assign() shares the input's blocks under copy-on-write rather than deep-copying
+    return df.assign(**indicators)
 
-# Page config with custom theme
-st.set_page_config(
-    page_title="Stock Analysis Pro",
-    page_icon="📈",
-    layout="wide",
-    initial_sidebar_state="expanded"
+
+# Price-chart overlays offered in the Advanced Chart tab
+_OVERLAY_OPTIONS = ("SMA (20)", "SMA (50)", "SMA (200)", "EMA (20)", "EMA (50)", "Bollinger Bands", "VWAP")
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def compute_overlays(close, volume=None):
+    """Computes the EMA and VWAP overlays as float32 arrays keyed by indicator name."""
+    # The full set is built once per loaded series, so changing the multiselect is a cache hit
+    close = close.astype(np.float64)
+    overlays = {}
+    
+    for indicator in _OVERLAY_OPTIONS:
+        if "EMA" in indicator:
+            period = int(indicator.split('(')[1].split(')')[0])
+            overlays[indicator] = _ewma(close, period).astype(np.float32)
+        
+        elif indicator == "VWAP" and volume is not None:
+            # Price*volume is accumulated and divided in one reused buffer
+            vwap = np.multiply(close, volume)
+            np.cumsum(vwap, out=vwap)
+            vwap /= np.cumsum(volume)
+            overlays[indicator] = vwap.astype(np.float32)
+    
+    return overlays
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def export_csv_gz(df):
+    """Serializes a DataFrame to gzip-compressed CSV bytes for download."""
+    # Arrow's CSV writer is multi-threaded native code, several times faster than to_csv;
+    # daily bars keep the plain date column that to_csv used to write first
+    dates = pa.array(df.index.values.astype('datetime64[D]'))
+    table = pa.Table.from_pandas(df, preserve_index=False).add_column(0, df.index.name or 'Date', dates)
+    sink = pa.BufferOutputStream()
+    with pa.CompressedOutputStream(sink, 'gzip') as out:
+        pacsv.write_csv(table, out, pacsv.WriteOptions(quoting_header='none'))
+    return sink.getvalue().to_pybytes()
+
+
+def export_pdf_report(ticker, start_date, end_date, current_price, price_change, price_change_pct,
+                      high_52w, low_52w, analysis, generated):
+    """Renders the analysis report to PDF bytes for download, stamped with the generated time."""
+    # Built in memory: no temp file to write, read back and delete
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor='#667eea',
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    
+    # Report details and key metrics as one label/value table: a single
+    # layout pass instead of a Paragraph (and style lookup) per line
+    metrics_rows = [
+        ["Generated", generated.strftime('%Y-%m-%d %H:%M:%S')],
+        ["Date Range", f"{start_date} to {end_date}"],
+        ["Current Price", f"${current_price:.2f}"],
+        ["Price Change", f"{price_change:+.2f} ({price_change_pct:+.2f}%)"],
+        ["52-Week High", f"${high_52w:.2f}"],
+        ["52-Week Low", f"${low_52w:.2f}"],
+    ]
+    metrics_style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ])
+    
+    content = [
+        Paragraph(f"Stock Analysis Report: {ticker}", title_style),
+        Table(metrics_rows, colWidths=[2 * inch, 3 * inch], hAlign='LEFT', style=metrics_style),
+        Spacer(1, 24),
+        Paragraph("AI Analysis", styles['Heading2']),
+        Paragraph(analysis.replace('\n', '<br/>'), styles['Normal']),
+    ]
+    
+    doc.build(content)
+    return buffer.getvalue()
+
+
+def _backtest_curves(close, signal):
+    """Daily returns and growth-of-$1 curves with market in column 0 and strategy in column 1."""
+    # The first row has no prior close, and the strategy trades on yesterday's signal.
+    # Each return is formed in float64 (the ratio sits near 1.0, so subtracting 1 in float32
+    # would cancel most digits) and only then stored in the float32 matrix
+    returns = np.empty((len(close), 2), dtype=np.float32)
+    returns[0] = np.nan
+    returns[1:, 0] = close[1:] / close[:-1] - 1
+    np.multiply(signal[:-1], returns[1:, 0], out=returns[1:, 1])
+    return returns, np.nancumprod(np.add(returns, 1.0, dtype=np.float64), axis=0)
+
+
+def _sharpe_ratio(returns):
+    """Annualized Sharpe ratio of each column of daily returns (0 where returns are flat)."""
+    std = returns.std(axis=0, ddof=1, dtype=np.float64)
+    return np.divide(returns.mean(axis=0, dtype=np.float64) * np.sqrt(252), std, out=np.zeros_like(std), where=std != 0)
+
+
+def _max_drawdown_pct(cumulative):
+    """Largest peak-to-trough decline of each cumulative return column, in percent."""
+    running_max = np.maximum.accumulate(cumulative, axis=0)
+    return ((cumulative - running_max) / running_max).min(axis=0) * 100
+
+
+# Indicator columns (computed once at fetch time) that feed each backtest strategy
+_STRATEGY_INPUTS = {
+    "SMA Crossover (20/50)": ('SMA_20', 'SMA_50'),
+    "SMA Crossover (50/200)": ('SMA_50', 'SMA_200'),
+    "RSI Mean Reversion": ('RSI',),
+    "MACD Crossover": ('MACD', 'MACD_Signal'),
+}
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def run_backtest(strategy_type, close, *inputs):
+    """Trade points, growth curves and stats for one strategy; None when warm-up leaves no bars."""
+    # Indicators arrive precomputed (see _STRATEGY_INPUTS); each branch only derives the signal
+    if strategy_type == "SMA Crossover (20/50)":
+        signal = _crossover_signal(*inputs)
+        warmup = 50 - 1
+    elif strategy_type == "SMA Crossover (50/200)":
+        signal = _crossover_signal(*inputs)
+        warmup = 200 - 1
+    elif strategy_type == "RSI Mean Reversion":
+        signal = _rsi_reversion_signal(*inputs)
+        warmup = 14
+    elif strategy_type == "MACD Crossover":
+        signal = _crossover_signal(*inputs)
+        warmup = _INDICATOR_WARMUP
+    
+    # Market and strategy side by side, so every pass below covers both at once;
+    # growth of $1 is compounded over the full history before warm-up rows are trimmed
+    returns, growth = _backtest_curves(close, signal)
+    
+    # NaNs only occur in the warm-up prefix, so slicing (a view) replaces a NaN scan;
+    # rows where any loaded indicator is still warming up are skipped as well
+    start = max(1, warmup, _INDICATOR_WARMUP)
+    if start >= len(close):
+        return None
+    
+    returns = returns[start:]
+    growth = growth[start:]
+    signal = signal[start:]
+    
+    # Entries/exits are the positions where the signal steps up/down by one
+    signal_steps = np.diff(signal, prepend=signal[0])
+    return {
+        'start': start,
+        'buy_idx': np.flatnonzero(signal_steps == 1),
+        'sell_idx': np.flatnonzero(signal_steps == -1),
+        'growth': growth,
+        'total_return': (growth[-1] - 1) * 100,
+        'sharpe': _sharpe_ratio(returns),
+        'drawdown': _max_drawdown_pct(growth),
+    }
+
+
+def _lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out points that best keep the line's shape."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        # Pick the bucket point spanning the largest triangle with the last kept point and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    
+    return keep
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def lttb_indices(index, values, n_out=2000):
+    """Cached LTTB row selection for a datetime64 index and its float values."""
+    return _lttb(index.view(np.int64).astype(np.float64), values.astype(np.float64), n_out)
+
+
+_GRID_AXIS = dict(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
+
+# Styling shared by every chart, merged into each figure's own layout: Streamlit's chart
+# theme overrides template-level settings (grid, backgrounds) but keeps explicit layout values
+_CHART_LAYOUT = dict(
+    template='plotly_dark',
+    hovermode='x unified',
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    xaxis=_GRID_AXIS,
+    yaxis=_GRID_AXIS
 )
 
-# Custom CSS for premium look
-st.markdown("""
+# Red/green bar colouring as a two-stop colorscale: bars carry compact 0/1 codes
+# (sent as a binary array) instead of one hex string per bar
+_DOWN_UP_COLORS = dict(colorscale=[[0, '#ef4444'], [1, '#10b981']], cmin=0, cmax=1)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def build_rsi_fig(index, rsi):
+    """Builds the RSI panel with overbought/oversold bands."""
+    # One figure spec instead of add_trace/add_hline/update_* calls, so Plotly validates once
+    band = dict(xref='x domain', x0=0, x1=1, yref='y')
+    return go.Figure(
+        data=[dict(
+            type='scattergl',
+            x=index,
+            y=rsi,
+            mode='lines',
+            name='RSI',
+            line=dict(color='#667eea', width=2)
+        )],
+        layout=dict(
+            _CHART_LAYOUT,
+            height=300,
+            showlegend=False,
+            margin=dict(l=50, r=50, t=30, b=30),
+            yaxis=dict(_GRID_AXIS, range=[0, 100]),
+            shapes=[
+                dict(type='line', y0=70, y1=70, line=dict(color='#ef4444', dash='dash'), **band),
+                dict(type='line', y0=30, y1=30, line=dict(color='#10b981', dash='dash'), **band),
+                dict(type='rect', y0=70, y1=100, fillcolor='#ef4444', opacity=0.1, line_width=0, **band),
+                dict(type='rect', y0=0, y1=30, fillcolor='#10b981', opacity=0.1, line_width=0, **band),
+            ],
+            annotations=[
+                dict(text="Overbought (70)", xref='x domain', x=1, yref='y', y=70,
+                     xanchor='right', yanchor='bottom', showarrow=False),
+                dict(text="Oversold (30)", xref='x domain', x=1, yref='y', y=30,
+                     xanchor='right', yanchor='bottom', showarrow=False),
+            ]
+        )
+    )
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def build_macd_fig(index, macd, macd_signal, macd_hist):
+    """Builds the MACD panel: MACD and signal lines over the histogram."""
+    return go.Figure(
+        data=[
+            dict(type='scattergl', x=index, y=macd, mode='lines', name='MACD',
+                 line=dict(color='#667eea', width=2)),
+            dict(type='scattergl', x=index, y=macd_signal, mode='lines', name='Signal',
+                 line=dict(color='#f59e0b', width=2)),
+            dict(type='bar', x=index, y=macd_hist, name='Histogram',
+                 marker=dict(color=(macd_hist >= 0).astype(np.int8), **_DOWN_UP_COLORS),
+                 opacity=0.5),
+        ],
+        layout=dict(
+            _CHART_LAYOUT,
+            height=300,
+            showlegend=True,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            margin=dict(l=50, r=50, t=30, b=30)
+        )
+    )
+
+
+# Backtest figures are kept as shared objects (not copied per rerun like cache_data results),
+# so changing an unrelated widget re-sends the same figure without rebuilding it
+@st.cache_resource(max_entries=8, show_spinner=False)
+def build_equity_fig(index, equity):
+    """Builds the strategy vs. buy-and-hold equity curve chart."""
+    # Long backtests: line traces keep ~2000 LTTB points
+    rows = slice(None)
+    if len(index) > 2000:
+        rows = lttb_indices(index, equity[:, 1])
+    x = index[rows]
+    return go.Figure(
+        data=[
+            dict(type='scattergl', x=x, y=equity[rows, 1].astype(np.float32), mode='lines',
+                 name='Strategy', line=dict(color='#667eea', width=3),
+                 fill='tozeroy', fillcolor='rgba(102, 126, 234, 0.2)'),
+            dict(type='scattergl', x=x, y=equity[rows, 0].astype(np.float32), mode='lines',
+                 name='Buy & Hold', line=dict(color='#f59e0b', width=2, dash='dash')),
+        ],
+        layout=dict(
+            _CHART_LAYOUT,
+            title="Equity Curve Comparison",
+            height=400,
+            showlegend=True,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            margin=dict(l=50, r=50, t=80, b=30),
+            yaxis=dict(_GRID_AXIS, title="Portfolio Value ($)")
+        )
+    )
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def build_signals_fig(index, close, buy_idx, sell_idx):
+    """Builds the price chart with backtest entry and exit markers."""
+    # The price line is downsampled like the equity curve; trade markers stay exact
+    rows = slice(None)
+    if len(index) > 2000:
+        rows = lttb_indices(index, close)
+    return go.Figure(
+        data=[
+            dict(type='scattergl', x=index[rows], y=close[rows].astype(np.float32), mode='lines',
+                 name='Price', line=dict(color='#667eea', width=2)),
+            dict(type='scattergl', x=index[buy_idx], y=close[buy_idx].astype(np.float32), mode='markers',
+                 name='Buy', marker=dict(color='#10b981', size=12, symbol='triangle-up')),
+            dict(type='scattergl', x=index[sell_idx], y=close[sell_idx].astype(np.float32), mode='markers',
+                 name='Sell', marker=dict(color='#ef4444', size=12, symbol='triangle-down')),
+        ],
+        layout=dict(
+            _CHART_LAYOUT,
+            height=400,
+            showlegend=True,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            margin=dict(l=50, r=50, t=30, b=30),
+            yaxis=dict(_GRID_AXIS, title="Price ($)")
+        )
+    )
+
+
+# Look-back length in days for each fixed "Quick Date Range" preset
+_PRESET_DAYS = {
+    "1 Week": 7,
+    "1 Month": 30,
+    "3 Months": 90,
+    "6 Months": 180,
+    "1 Year": 365,
+    "5 Years": 1825,
+}
+
+# Static page markup (CSS, header and welcome screen)
+_CSS = """
 <style>
     /* Main theme colors */
     :root {
@@ -150,6 +626,12 @@ st.markdown("""
         box-shadow: 0 12px 48px rgba(0,0,0,0.15);
     }
     
+    .metric-grid {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 1rem;
+    }
+    
     .metric-value {
         font-size: 2rem;
         font-weight: 700;
@@ -242,15 +724,75 @@ st.markdown("""
         border-radius: 6px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# Header
-st.markdown("""
+_HEADER_HTML = """
 <div class="main-header">
     <h1>📈 Stock Analysis Pro</h1>
     <p>AI-Powered Technical Analysis & Market Intelligence</p>
 </div>
-""", unsafe_allow_html=True)
+"""
+
+_METRIC_CARD_TMPL = """
+<div class="metric-card">
+    <div class="metric-label">{label}</div>
+    <div class="metric-value">{value}</div>
+    <div class="metric-change" style="color: {color}">
+        {change}
+    </div>
+</div>
+"""
+
+# Backtest headline card, tinted green/red by whether the strategy beat buy & hold
+_STRATEGY_CARD_TMPL = """
+<div class="metric-card" style="background: linear-gradient(135deg, {start} 0%, {end} 100%);">
+    <div class="metric-label">Strategy Return</div>
+    <div class="metric-value">{value}</div>
+    <div class="metric-change" style="color: white">
+        {change}
+    </div>
+</div>
+"""
+
+_WELCOME_HTML = """
+    <div style="text-align: center; padding: 4rem 2rem;">
+        <h2 style="color: #667eea; margin-bottom: 1rem;">👋 Welcome to Stock Analysis Pro</h2>
+        <p style="font-size: 1.2rem; color: rgba(255,255,255,0.7); margin-bottom: 2rem;">
+            Get started by entering a stock ticker and fetching data from the sidebar
+        </p>
+        <div style="display: flex; justify-content: center; gap: 2rem; margin-top: 3rem;">
+            <div style="background: rgba(102, 126, 234, 0.1); padding: 2rem; border-radius: 12px; max-width: 300px;">
+                <div style="font-size: 3rem; margin-bottom: 1rem;">📈</div>
+                <h3 style="color: #667eea;">Advanced Charts</h3>
+                <p style="color: rgba(255,255,255,0.6)">Interactive candlestick charts with multiple technical indicators</p>
+            </div>
+            <div style="background: rgba(102, 126, 234, 0.1); padding: 2rem; border-radius: 12px; max-width: 300px;">
+                <div style="font-size: 3rem; margin-bottom: 1rem;">🤖</div>
+                <h3 style="color: #667eea;">AI Analysis</h3>
+                <p style="color: rgba(255,255,255,0.6)">Get intelligent insights powered by Llama Vision AI</p>
+            </div>
+            <div style="background: rgba(102, 126, 234, 0.1); padding: 2rem; border-radius: 12px; max-width: 300px;">
+                <div style="font-size: 3rem; margin-bottom: 1rem;">⚡</div>
+                <h3 style="color: #667eea;">Backtesting</h3>
+                <p style="color: rgba(255,255,255,0.6)">Test trading strategies with historical data</p>
+            </div>
+        </div>
+    </div>
+    """
+
+# Page config with custom theme
+st.set_page_config(
+    page_title="Stock Analysis Pro",
+    page_icon="📈",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS for premium look
+st.markdown(_CSS, unsafe_allow_html=True)
+
+# Header
+st.markdown(_HEADER_HTML, unsafe_allow_html=True)
 
 # Initialize session state
 if 'stock_data' not in st.session_state:
@@ -259,6 +801,12 @@ if 'ai_analysis' not in st.session_state:
     st.session_state['ai_analysis'] = None
 if 'ticker_info' not in st.session_state:
     st.session_state['ticker_info'] = None
+if 'chart_index' not in st.session_state:
+    st.session_state['chart_index'] = None
+if 'date_range_label' not in st.session_state:
+    st.session_state['date_range_label'] = None
+if 'backtest_strategy' not in st.session_state:
+    st.session_state['backtest_strategy'] = None
 
 # Sidebar Configuration
 with st.sidebar:
@@ -281,27 +829,12 @@ with st.sidebar:
     
     today = datetime.today().date()
     
-    if date_preset == "1 Week":
-        start_date = today - timedelta(days=7)
-        end_date = today
-    elif date_preset == "1 Month":
-        start_date = today - timedelta(days=30)
-        end_date = today
-    elif date_preset == "3 Months":
-        start_date = today - timedelta(days=90)
-        end_date = today
-    elif date_preset == "6 Months":
-        start_date = today - timedelta(days=180)
-        end_date = today
-    elif date_preset == "1 Year":
-        start_date = today - timedelta(days=365)
+    if date_preset in _PRESET_DAYS:
+        start_date = today - timedelta(days=_PRESET_DAYS[date_preset])
         end_date = today
     elif date_preset == "YTD":
         start_date = datetime(today.year, 1, 1).date()
         end_date = today
-    elif date_preset == "5 Years":
-        start_date = today - timedelta(days=1825)
-        end_date = today
     else:
         start_date = st.date_input(
             "Start Date",
@@ -320,8 +853,15 @@ with st.sidebar:
     
     if fetch_btn:
         with st.spinner(f"Fetching data for {ticker}..."):
-            # Fetch stock data with retry logic
-            df, error = fetch_stock_data(ticker, start_date, end_date)
+            # Fetch prices (with retry logic) and ticker info concurrently; workers inherit
+            # this session's script context so the cached fetchers run as if called inline
+            with ThreadPoolExecutor(
+                max_workers=2, initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx())
+            ) as executor:
+                data_future = executor.submit(fetch_stock_data, ticker, start_date, end_date)
+                info_future = executor.submit(fetch_ticker_info, ticker)
+                df, error = data_future.result()
+                ticker_info = info_future.result()
             
             if error:
                 st.error(error)
@@ -330,11 +870,16 @@ with st.sidebar:
             elif df.empty:
                 st.error("❌ No data found for this ticker and date range.")
             else:
-                # Fetch ticker info
-                ticker_info = fetch_ticker_info(ticker)
+                # Indicators are computed once per fetch and stored with the prices, so widget
+                # reruns reuse them; warm-up rows keep NaN indicators, which Plotly draws as gaps
+                df = calculate_technical_indicators(df, 'Close')
                 
                 st.session_state['stock_data'] = df
                 st.session_state['ticker_info'] = ticker_info
+                # Chart x-axis and sidebar label are derived once per fetch, not on every rerun
+                st.session_state['chart_index'] = df.index.to_numpy(dtype='datetime64[ms]')
+                st.session_state['date_range_label'] = f"{df.index[0]:%Y-%m-%d} to {df.index[-1]:%Y-%m-%d}"
+                st.session_state['backtest_strategy'] = None
                 st.success(f"✅ Loaded {len(df)} days of data!")
     
     # Show data info if available
@@ -343,25 +888,16 @@ with st.sidebar:
         st.markdown("### 📊 Data Info")
         data = st.session_state['stock_data']
         st.metric("Days Loaded", len(data))
-        st.metric("Date Range", f"{data.index[0].strftime('%Y-%m-%d')} to {data.index[-1].strftime('%Y-%m-%d')}")
+        st.metric("Date Range", st.session_state['date_range_label'])
 
 # Main content
 if st.session_state['stock_data'] is not None:
     data = st.session_state['stock_data']
     ticker_info = st.session_state.get('ticker_info', {})
+    chart_index = st.session_state['chart_index']
     
-    # Determine column names
-    close_col = 'Close' if 'Close' in data.columns else f'Close_{ticker}'
-    open_col = 'Open' if 'Open' in data.columns else f'Open_{ticker}'
-    high_col = 'High' if 'High' in data.columns else f'High_{ticker}'
-    low_col = 'Low' if 'Low' in data.columns else f'Low_{ticker}'
-    volume_col = 'Volume' if 'Volume' in data.columns else f'Volume_{ticker}'
-    
-    
-    if len(data) >= 50:
-        data = calculate_technical_indicators(data, close_col).dropna()
-        if data.empty:
-            st.warning("Not enough clean data after calculating technical indicators. Charts may be incomplete.")
+    # Column names (fetch_stock_data keeps Yahoo's plain field names)
+    close_col, open_col, high_col, low_col, volume_col = 'Close', 'Open', 'High', 'Low', 'Volume'
     
     # Key Metrics Row
     st.markdown("### 📊 Key Metrics")
@@ -370,61 +906,60 @@ if st.session_state['stock_data'] is not None:
         st.warning("Data is empty. Please check your selected date range or ticker.")
         st.stop()
         
-    current_price = data[close_col].iloc[-1]
-    prev_price = data[close_col].iloc[-2] if len(data) > 1 else current_price
+    # Plain numpy views for the scalar reads below (avoids pandas indexing per value)
+    close_arr = data[close_col].to_numpy()
+    high_arr = data[high_col].to_numpy()
+    low_arr = data[low_col].to_numpy()
+    vol_arr = data[volume_col].to_numpy()
+    
+    current_price = close_arr[-1]
+    prev_price = close_arr[-2] if len(close_arr) > 1 else current_price
     price_change = current_price - prev_price
     price_change_pct = (price_change / prev_price) * 100 if prev_price != 0 else 0
     
     # Calculate additional metrics
-    high_52w = data[high_col].tail(252).max() if len(data) >= 252 else data[high_col].max()
-    low_52w = data[low_col].tail(252).min() if len(data) >= 252 else data[low_col].min()
-    avg_volume = data[volume_col].tail(20).mean()
+    # One slice object for the trailing 252 sessions; shorter histories just use every bar
+    last_year = slice(-252, None)
+    high_52w = high_arr[last_year].max()
+    low_52w = low_arr[last_year].min()
+    avg_volume = vol_arr[-20:].mean()
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
+    muted_color = "rgba(255,255,255,0.7)"
+    change_color = '#10b981' if price_change >= 0 else '#ef4444'
+    
     with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">Current Price</div>
-            <div class="metric-value">${current_price:.2f}</div>
-            <div class="metric-change" style="color: {'#10b981' if price_change >= 0 else '#ef4444'}">
-                {'+' if price_change >= 0 else ''}{price_change:.2f} ({'+' if price_change_pct >= 0 else ''}{price_change_pct:.2f}%)
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_METRIC_CARD_TMPL.format_map({
+            'label': "Current Price",
+            'value': f"${current_price:.2f}",
+            'color': change_color,
+            'change': f"{price_change:+.2f} ({price_change_pct:+.2f}%)",
+        }), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">52W High</div>
-            <div class="metric-value">${high_52w:.2f}</div>
-            <div class="metric-change" style="color: rgba(255,255,255,0.7)">
-                {((current_price / high_52w - 1) * 100):.1f}% from high
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_METRIC_CARD_TMPL.format_map({
+            'label': "52W High",
+            'value': f"${high_52w:.2f}",
+            'color': muted_color,
+            'change': f"{((current_price / high_52w - 1) * 100):.1f}% from high",
+        }), unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">52W Low</div>
-            <div class="metric-value">${low_52w:.2f}</div>
-            <div class="metric-change" style="color: rgba(255,255,255,0.7)">
-                {((current_price / low_52w - 1) * 100):.1f}% from low
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_METRIC_CARD_TMPL.format_map({
+            'label': "52W Low",
+            'value': f"${low_52w:.2f}",
+            'color': muted_color,
+            'change': f"{((current_price / low_52w - 1) * 100):.1f}% from low",
+        }), unsafe_allow_html=True)
     
     with col4:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">Avg Volume (20D)</div>
-            <div class="metric-value">{avg_volume/1e6:.2f}M</div>
-            <div class="metric-change" style="color: rgba(255,255,255,0.7)">
-                Last: {data[volume_col].iloc[-1]/1e6:.2f}M
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_METRIC_CARD_TMPL.format_map({
+            'label': "Avg Volume (20D)",
+            'value': f"{avg_volume/1e6:.2f}M",
+            'color': muted_color,
+            'change': f"Last: {vol_arr[-1]/1e6:.2f}M",
+        }), unsafe_allow_html=True)
     
     with col5:
         market_cap = ticker_info.get('marketCap', 0)
@@ -436,15 +971,12 @@ if st.session_state['stock_data'] is not None:
         pe_ratio = ticker_info.get('trailingPE', 'N/A')
         pe_str = f"{pe_ratio:.2f}" if isinstance(pe_ratio, (int, float)) else "N/A"
         
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-label">Market Cap</div>
-            <div class="metric-value">{market_cap_str}</div>
-            <div class="metric-change" style="color: rgba(255,255,255,0.7)">
-                P/E: {pe_str}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_METRIC_CARD_TMPL.format_map({
+            'label': "Market Cap",
+            'value': market_cap_str,
+            'color': muted_color,
+            'change': f"P/E: {pe_str}",
+        }), unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -470,7 +1002,7 @@ if st.session_state['stock_data'] is not None:
         st.markdown("#### Overlay Indicators")
         indicators = st.multiselect(
             "Select indicators to overlay",
-            ["SMA (20)", "SMA (50)", "SMA (200)", "EMA (20)", "EMA (50)", "Bollinger Bands", "VWAP"],
+            _OVERLAY_OPTIONS,
             default=["SMA (20)", "SMA (50)"]
         )
         
@@ -485,15 +1017,37 @@ if st.session_state['stock_data'] is not None:
         else:
             fig = make_subplots(rows=1, cols=1)
         
-        # Add price chart
+        # Long histories: aggregate bars so the browser draws a bounded number of candles.
+        # Prices are stored as float64; traces get float32 copies to halve the chart payload
+        ohlc_data = data
+        ohlc_index = chart_index
+        if len(data) > 2000 and chart_type in ("Candlestick", "OHLC"):
+            span_days = (data.index[-1] - data.index[0]).days
+            rule = 'D' if span_days < 365 else 'W' if span_days < 1825 else 'MS'
+            ohlc_data = data.resample(rule).agg({
+                open_col: 'first',
+                high_col: 'max',
+                low_col: 'min',
+                close_col: 'last'
+            }).dropna()
+            ohlc_index = ohlc_data.index.to_numpy(dtype='datetime64[ms]')
+        
+        # Long histories: line traces keep the ~2000 points that best preserve the close's shape
+        line_index = chart_index
+        line_rows = slice(None)
+        if len(data) > 2000:
+            line_rows = lttb_indices(chart_index, close_arr)
+            line_index = chart_index[line_rows]
+        
+        # Add price chart (line-type traces use WebGL; candlestick/OHLC have no WebGL variant)
         if chart_type == "Candlestick":
             fig.add_trace(
                 go.Candlestick(
-                    x=data.index,
-                    open=data[open_col],
-                    high=data[high_col],
-                    low=data[low_col],
-                    close=data[close_col],
+                    x=ohlc_index,
+                    open=ohlc_data[open_col].to_numpy(dtype=np.float32),
+                    high=ohlc_data[high_col].to_numpy(dtype=np.float32),
+                    low=ohlc_data[low_col].to_numpy(dtype=np.float32),
+                    close=ohlc_data[close_col].to_numpy(dtype=np.float32),
                     name="OHLC",
                     increasing_line_color='#10b981',
                     decreasing_line_color='#ef4444'
@@ -502,9 +1056,9 @@ if st.session_state['stock_data'] is not None:
             )
         elif chart_type == "Line":
             fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=data[close_col],
+                go.Scattergl(
+                    x=line_index,
+                    y=close_arr[line_rows].astype(np.float32),
                     mode='lines',
                     name='Close',
                     line=dict(color='#667eea', width=2)
@@ -513,9 +1067,9 @@ if st.session_state['stock_data'] is not None:
             )
         elif chart_type == "Area":
             fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=data[close_col],
+                go.Scattergl(
+                    x=line_index,
+                    y=close_arr[line_rows].astype(np.float32),
                     mode='lines',
                     name='Close',
                     fill='tozeroy',
@@ -527,11 +1081,11 @@ if st.session_state['stock_data'] is not None:
         elif chart_type == "OHLC":
             fig.add_trace(
                 go.Ohlc(
-                    x=data.index,
-                    open=data[open_col],
-                    high=data[high_col],
-                    low=data[low_col],
-                    close=data[close_col],
+                    x=ohlc_index,
+                    open=ohlc_data[open_col].to_numpy(dtype=np.float32),
+                    high=ohlc_data[high_col].to_numpy(dtype=np.float32),
+                    low=ohlc_data[low_col].to_numpy(dtype=np.float32),
+                    close=ohlc_data[close_col].to_numpy(dtype=np.float32),
                     name="OHLC"
                 ),
                 row=1, col=1
@@ -541,31 +1095,23 @@ if st.session_state['stock_data'] is not None:
         colors = ['#8b5cf6', '#ec4899', '#f59e0b', '#06b6d4', '#84cc16']
         color_idx = 0
         
+        # SMAs and Bollinger Bands come straight from the indicator columns computed at fetch time
+        overlays = compute_overlays(
+            data[close_col].to_numpy(), data[volume_col].to_numpy(dtype=np.float64)
+        )
+        
         for indicator in indicators:
-            if "SMA" in indicator:
-                period = int(indicator.split('(')[1].split(')')[0])
-                sma = data[close_col].rolling(window=period).mean()
-                fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=sma,
-                        mode='lines',
-                        name=f'SMA ({period})',
-                        line=dict(color=colors[color_idx % len(colors)], width=2)
-                    ),
-                    row=1, col=1
-                )
-                color_idx += 1
-            
-            elif "EMA" in indicator:
-                period = int(indicator.split('(')[1].split(')')[0])
-                ema = data[close_col].ewm(span=period, adjust=False).mean()
+            if "SMA" in indicator or "EMA" in indicator:
+                if "SMA" in indicator:
+                    line_values = data['SMA_' + indicator.split('(')[1].split(')')[0]].to_numpy()
+                else:
+                    line_values = overlays[indicator]
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=ema,
+                    go.Scattergl(
+                        x=line_index,
+                        y=line_values[line_rows],
                         mode='lines',
-                        name=f'EMA ({period})',
+                        name=indicator,
                         line=dict(color=colors[color_idx % len(colors)], width=2)
                     ),
                     row=1, col=1
@@ -573,19 +1119,10 @@ if st.session_state['stock_data'] is not None:
                 color_idx += 1
             
             elif indicator == "Bollinger Bands":
-                if 'BB_Upper' in data.columns:
-                    bb_upper = data['BB_Upper']
-                    bb_lower = data['BB_Lower']
-                else:
-                    sma = data[close_col].rolling(window=20).mean()
-                    std = data[close_col].rolling(window=20).std()
-                    bb_upper = sma + 2 * std
-                    bb_lower = sma - 2 * std
-                
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=bb_upper,
+                    go.Scattergl(
+                        x=line_index,
+                        y=data['BB_Upper'].to_numpy()[line_rows],
                         mode='lines',
                         name='BB Upper',
                         line=dict(color='rgba(255, 255, 255, 0.3)', width=1, dash='dash')
@@ -593,9 +1130,9 @@ if st.session_state['stock_data'] is not None:
                     row=1, col=1
                 )
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=bb_lower,
+                    go.Scattergl(
+                        x=line_index,
+                        y=data['BB_Lower'].to_numpy()[line_rows],
                         mode='lines',
                         name='BB Lower',
                         line=dict(color='rgba(255, 255, 255, 0.3)', width=1, dash='dash'),
@@ -606,11 +1143,10 @@ if st.session_state['stock_data'] is not None:
                 )
             
             elif indicator == "VWAP":
-                vwap = (data[close_col] * data[volume_col]).cumsum() / data[volume_col].cumsum()
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=vwap,
+                    go.Scattergl(
+                        x=line_index,
+                        y=overlays[indicator][line_rows],
                         mode='lines',
                         name='VWAP',
                         line=dict(color=colors[color_idx % len(colors)], width=2, dash='dot')
@@ -620,23 +1156,21 @@ if st.session_state['stock_data'] is not None:
                 color_idx += 1
         
         if show_volume:
-            colors_volume = ['#ef4444' if data[close_col].iloc[i] < data[open_col].iloc[i] else '#10b981' 
-                           for i in range(len(data))]
+            candle_up = (data[close_col].to_numpy() >= data[open_col].to_numpy()).astype(np.int8)
             fig.add_trace(
                 go.Bar(
-                    x=data.index,
+                    x=chart_index,
                     y=data[volume_col],
                     name='Volume',
-                    marker_color=colors_volume,
+                    marker=dict(color=candle_up, **_DOWN_UP_COLORS),
                     opacity=0.5
                 ),
                 row=2, col=1
             )
         
         fig.update_layout(
+            _CHART_LAYOUT,
             height=700,
-            template='plotly_dark',
-            hovermode='x unified',
             showlegend=True,
             legend=dict(
                 orientation="h",
@@ -646,13 +1180,14 @@ if st.session_state['stock_data'] is not None:
                 x=1
             ),
             margin=dict(l=50, r=50, t=80, b=50),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis_rangeslider_visible=False
+            xaxis_rangeslider_visible=False,
+            # Keep zoom/pan (and the WebGL context) across reruns until the ticker changes
+            uirevision=ticker
         )
         
-        fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
-        fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
+        # The volume subplot has its own axes, so the grid goes on every axis explicitly
+        fig.update_xaxes(_GRID_AXIS)
+        fig.update_yaxes(_GRID_AXIS)
         
         st.plotly_chart(fig, use_container_width=True)
     
@@ -688,7 +1223,8 @@ if st.session_state['stock_data'] is not None:
     with tab3:
         st.markdown("### 📊 Technical Indicators Overview")
         
-        if 'RSI' in data.columns and 'MACD' in data.columns and 'BB_Upper' in data.columns:
+        # The cards read the latest bar, which has every indicator once the MACD signal has warmed up
+        if len(data) > _INDICATOR_WARMUP:
             
             ind_col1, ind_col2, ind_col3 = st.columns(3)
 
@@ -696,121 +1232,57 @@ if st.session_state['stock_data'] is not None:
                 current_rsi = data['RSI'].iloc[-1]
                 rsi_signal = "Oversold 🟢" if current_rsi < 30 else "Overbought 🔴" if current_rsi > 70 else "Neutral 🟡"
                 rsi_color = "#10b981" if current_rsi < 30 else "#ef4444" if current_rsi > 70 else "#f59e0b"
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-label">RSI (14)</div>
-                    <div class="metric-value">{current_rsi:.2f}</div>
-                    <div class="metric-change" style="color: {rsi_color}">
-                        {rsi_signal}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(_METRIC_CARD_TMPL.format_map({
+                    'label': "RSI (14)",
+                    'value': f"{current_rsi:.2f}",
+                    'color': rsi_color,
+                    'change': rsi_signal,
+                }), unsafe_allow_html=True)
 
             with ind_col2:
                 current_macd = data['MACD'].iloc[-1]
                 current_signal = data['MACD_Signal'].iloc[-1]
                 macd_trend = "Bullish 🟢" if current_macd > current_signal else "Bearish 🔴"
                 macd_color = "#10b981" if current_macd > current_signal else "#ef4444"
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-label">MACD</div>
-                    <div class="metric-value">{current_macd:.2f}</div>
-                    <div class="metric-change" style="color: {macd_color}">
-                        {macd_trend}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(_METRIC_CARD_TMPL.format_map({
+                    'label': "MACD",
+                    'value': f"{current_macd:.2f}",
+                    'color': macd_color,
+                    'change': macd_trend,
+                }), unsafe_allow_html=True)
 
             with ind_col3:
-                current_price_val = data[close_col].iloc[-1]
+                current_price_val = close_arr[-1]
                 bb_upper_val = data['BB_Upper'].iloc[-1]
                 bb_lower_val = data['BB_Lower'].iloc[-1]
                 bb_position = ((current_price_val - bb_lower_val) / (bb_upper_val - bb_lower_val)) * 100
                 bb_signal = "Near Upper 🔴" if bb_position > 80 else "Near Lower 🟢" if bb_position < 20 else "Mid Range 🟡"
                 bb_color = "#ef4444" if bb_position > 80 else "#10b981" if bb_position < 20 else "#f59e0b"
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-label">Bollinger Bands</div>
-                    <div class="metric-value">{bb_position:.1f}%</div>
-                    <div class="metric-change" style="color: {bb_color}">
-                        {bb_signal}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(_METRIC_CARD_TMPL.format_map({
+                    'label': "Bollinger Bands",
+                    'value': f"{bb_position:.1f}%",
+                    'color': bb_color,
+                    'change': bb_signal,
+                }), unsafe_allow_html=True)
 
             st.markdown("<br>", unsafe_allow_html=True)
             
             # RSI Chart
             st.markdown("#### RSI (Relative Strength Index)")
-            rsi_fig = go.Figure()
-            rsi_fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data['RSI'],
-                mode='lines',
-                name='RSI',
-                line=dict(color='#667eea', width=2)
-            ))
-            rsi_fig.add_hline(y=70, line_dash="dash", line_color="#ef4444", annotation_text="Overbought (70)")
-            rsi_fig.add_hline(y=30, line_dash="dash", line_color="#10b981", annotation_text="Oversold (30)")
-            rsi_fig.add_hrect(y0=70, y1=100, fillcolor="#ef4444", opacity=0.1, line_width=0)
-            rsi_fig.add_hrect(y0=0, y1=30, fillcolor="#10b981", opacity=0.1, line_width=0)
-            
-            rsi_fig.update_layout(
-                height=300,
-                template='plotly_dark',
-                hovermode='x unified',
-                showlegend=False,
-                margin=dict(l=50, r=50, t=30, b=30),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                yaxis=dict(range=[0, 100])
-            )
-            rsi_fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
-            rsi_fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
+            rsi_fig = build_rsi_fig(chart_index, data['RSI'].to_numpy(dtype=np.float32))
             st.plotly_chart(rsi_fig, use_container_width=True)
             
             # MACD Chart
             st.markdown("#### MACD (Moving Average Convergence Divergence)")
-            macd_fig = go.Figure()
-            macd_fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data['MACD'],
-                mode='lines',
-                name='MACD',
-                line=dict(color='#667eea', width=2)
-            ))
-            macd_fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data['MACD_Signal'],
-                mode='lines',
-                name='Signal',
-                line=dict(color='#f59e0b', width=2)
-            ))
-            
-            colors_hist = ['#10b981' if val >= 0 else '#ef4444' for val in data['MACD_Hist']]
-            macd_fig.add_trace(go.Bar(
-                x=data.index,
-                y=data['MACD_Hist'],
-                name='Histogram',
-                marker_color=colors_hist,
-                opacity=0.5
-            ))
-            
-            macd_fig.update_layout(
-                height=300,
-                template='plotly_dark',
-                hovermode='x unified',
-                showlegend=True,
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                margin=dict(l=50, r=50, t=30, b=30),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
+            macd_fig = build_macd_fig(
+                chart_index,
+                data['MACD'].to_numpy(dtype=np.float32),
+                data['MACD_Signal'].to_numpy(dtype=np.float32),
+                data['MACD_Hist'].to_numpy(dtype=np.float32)
             )
-            macd_fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
-            macd_fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
             st.plotly_chart(macd_fig, use_container_width=True)
         else:
-            st.warning("Not enough data points to calculate all technical indicators (need at least 26 days). Please select a longer date range.")
+            st.warning(f"Not enough data points to calculate all technical indicators (need at least {_INDICATOR_WARMUP + 1} days). Please select a longer date range.")
 
     # TAB 4: Backtest
     with tab4:
@@ -821,207 +1293,73 @@ if st.session_state['stock_data'] is not None:
         with bt_col1:
             strategy_type = st.selectbox(
                 "Select Strategy",
-                ["SMA Crossover (20/50)", "SMA Crossover (50/200)", "RSI Mean Reversion", "MACD Crossover"]
+                list(_STRATEGY_INPUTS)
             )
         
         with bt_col2:
             initial_capital = st.number_input("Initial Capital ($)", value=10000, step=1000)
         
         if st.button("🚀 Run Backtest", use_container_width=True):
+            st.session_state['backtest_strategy'] = strategy_type
+        
+        # Results stay up across reruns (e.g. the chart toggle) until another strategy is picked
+        if st.session_state['backtest_strategy'] == strategy_type:
             with st.spinner("Running backtest simulation..."):
-                bt_data = data.copy()
-                
-                if strategy_type == "SMA Crossover (20/50)":
-                    bt_data['SMA_Fast'] = bt_data[close_col].rolling(20).mean()
-                    bt_data['SMA_Slow'] = bt_data[close_col].rolling(50).mean()
-                    bt_data['Signal'] = 0
-                    bt_data.loc[bt_data['SMA_Fast'] > bt_data['SMA_Slow'], 'Signal'] = 1
-                    
-                elif strategy_type == "SMA Crossover (50/200)":
-                    bt_data['SMA_Fast'] = bt_data[close_col].rolling(50).mean()
-                    bt_data['SMA_Slow'] = bt_data[close_col].rolling(200).mean()
-                    bt_data['Signal'] = 0
-                    bt_data.loc[bt_data['SMA_Fast'] > bt_data['SMA_Slow'], 'Signal'] = 1
-                    
-                elif strategy_type == "RSI Mean Reversion":
-                    if 'RSI' not in bt_data.columns:
-                        delta = bt_data[close_col].diff()
-                        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                        rs = gain / loss.replace(0, np.nan)
-                        bt_data['RSI'] = 100 - (100 / (1 + rs))
-                    
-                    bt_data['Signal'] = 0
-                    bt_data.loc[bt_data['RSI'] < 30, 'Signal'] = 1
-                    bt_data.loc[bt_data['RSI'] > 70, 'Signal'] = -1
-                    
-                elif strategy_type == "MACD Crossover":
-                    if 'MACD' not in bt_data.columns:
-                        exp1 = bt_data[close_col].ewm(span=12, adjust=False).mean()
-                        exp2 = bt_data[close_col].ewm(span=26, adjust=False).mean()
-                        bt_data['MACD'] = exp1 - exp2
-                        bt_data['MACD_Signal'] = bt_data['MACD'].ewm(span=9, adjust=False).mean()
-                        
-                    bt_data['Signal'] = 0
-                    bt_data.loc[bt_data['MACD'] > bt_data['MACD_Signal'], 'Signal'] = 1
-                
-                bt_data['Returns'] = bt_data[close_col].pct_change()
-                bt_data['Strategy_Returns'] = bt_data['Signal'].shift(1) * bt_data['Returns']
-                
-                bt_data['Cumulative_Market'] = (1 + bt_data['Returns']).cumprod()
-                bt_data['Cumulative_Strategy'] = (1 + bt_data['Strategy_Returns']).cumprod()
-                
-                bt_data = bt_data.dropna()
+                # Work on NumPy views of the loaded frame instead of copying it; the
+                # cached run is keyed on the arrays and strategy, so capital changes reuse it
+                bt = run_backtest(
+                    strategy_type,
+                    close_arr,
+                    *(data[col].to_numpy() for col in _STRATEGY_INPUTS[strategy_type])
+                )
                 
-                if not bt_data.empty:
-                    total_return_market = (bt_data['Cumulative_Market'].iloc[-1] - 1) * 100
-                    total_return_strategy = (bt_data['Cumulative_Strategy'].iloc[-1] - 1) * 100
+                if bt is not None:
+                    bt_index = chart_index[bt['start']:]
+                    bt_close = close_arr[bt['start']:]
+                    equity = bt['growth'] * initial_capital
                     
-                    final_capital_market = initial_capital * bt_data['Cumulative_Market'].iloc[-1]
-                    final_capital_strategy = initial_capital * bt_data['Cumulative_Strategy'].iloc[-1]
-                    
-                    sharpe_market = (bt_data['Returns'].mean() / bt_data['Returns'].std()) * np.sqrt(252) if bt_data['Returns'].std() != 0 else 0
-                    sharpe_strategy = (bt_data['Strategy_Returns'].mean() / bt_data['Strategy_Returns'].std()) * np.sqrt(252) if bt_data['Strategy_Returns'].std() != 0 else 0
-                    
-                    cumulative_market = bt_data['Cumulative_Market']
-                    running_max_market = cumulative_market.expanding().max()
-                    drawdown_market = ((cumulative_market - running_max_market) / running_max_market).min() * 100
-                    
-                    cumulative_strategy = bt_data['Cumulative_Strategy']
-                    running_max_strategy = cumulative_strategy.expanding().max()
-                    drawdown_strategy = ((cumulative_strategy - running_max_strategy) / running_max_strategy).min() * 100
+                    total_return_market, total_return_strategy = bt['total_return']
+                    final_capital_market, final_capital_strategy = equity[-1]
+                    sharpe_market, sharpe_strategy = bt['sharpe']
+                    drawdown_market, drawdown_strategy = bt['drawdown']
                     
                     st.markdown("#### 📊 Backtest Results")
                     
-                    result_col1, result_col2, result_col3, result_col4 = st.columns(4)
-                    
-                    with result_col1:
-                        st.markdown(f"""
-                        <div class="metric-card" style="background: linear-gradient(135deg, {'#10b981' if total_return_strategy > total_return_market else '#ef4444'} 0%, {'#059669' if total_return_strategy > total_return_market else '#dc2626'} 100%);">
-                            <div class="metric-label">Strategy Return</div>
-                            <div class="metric-value">{total_return_strategy:.2f}%</div>
-                            <div class="metric-change" style="color: white">
-                                ${final_capital_strategy:,.2f}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with result_col2:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-label">Buy & Hold Return</div>
-                            <div class="metric-value">{total_return_market:.2f}%</div>
-                            <div class="metric-change" style="color: rgba(255,255,255,0.7)">
-                                ${final_capital_market:,.2f}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with result_col3:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-label">Strategy Sharpe</div>
-                            <div class="metric-value">{sharpe_strategy:.2f}</div>
-                            <div class="metric-change" style="color: rgba(255,255,255,0.7)">
-                                Market: {sharpe_market:.2f}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with result_col4:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-label">Max Drawdown</div>
-                            <div class="metric-value">{drawdown_strategy:.2f}%</div>
-                            <div class="metric-change" style="color: rgba(255,255,255,0.7)">
-                                Market: {drawdown_market:.2f}%
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    st.markdown("<br>", unsafe_allow_html=True)
-                    
-                    equity_fig = go.Figure()
-                    
-                    equity_fig.add_trace(go.Scatter(
-                        x=bt_data.index,
-                        y=bt_data['Cumulative_Strategy'] * initial_capital,
-                        mode='lines',
-                        name='Strategy',
-                        line=dict(color='#667eea', width=3),
-                        fill='tozeroy',
-                        fillcolor='rgba(102, 126, 234, 0.2)'
-                    ))
-                    
-                    equity_fig.add_trace(go.Scatter(
-                        x=bt_data.index,
-                        y=bt_data['Cumulative_Market'] * initial_capital,
-                        mode='lines',
-                        name='Buy & Hold',
-                        line=dict(color='#f59e0b', width=2, dash='dash')
-                    ))
-                    
-                    equity_fig.update_layout(
-                        title="Equity Curve Comparison",
-                        height=400,
-                        template='plotly_dark',
-                        hovermode='x unified',
-                        showlegend=True,
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                        margin=dict(l=50, r=50, t=80, b=30),
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        yaxis_title="Portfolio Value ($)"
+                    # All four cards go out as one grid in a single markdown element
+                    beat_market = total_return_strategy > total_return_market
+                    strategy_card = _STRATEGY_CARD_TMPL.format_map({
+                        'start': '#10b981' if beat_market else '#ef4444',
+                        'end': '#059669' if beat_market else '#dc2626',
+                        'value': f"{total_return_strategy:.2f}%",
+                        'change': f"${final_capital_strategy:,.2f}",
+                    })
+                    result_cards = [
+                        {'label': "Buy & Hold Return", 'value': f"{total_return_market:.2f}%",
+                         'change': f"${final_capital_market:,.2f}"},
+                        {'label': "Strategy Sharpe", 'value': f"{sharpe_strategy:.2f}",
+                         'change': f"Market: {sharpe_market:.2f}"},
+                        {'label': "Max Drawdown", 'value': f"{drawdown_strategy:.2f}%",
+                         'change': f"Market: {drawdown_market:.2f}%"},
+                    ]
+                    st.markdown(
+                        '<div class="metric-grid">'
+                        + strategy_card
+                        + ''.join(_METRIC_CARD_TMPL.format_map({**card, 'color': muted_color}) for card in result_cards)
+                        + '</div>',
+                        unsafe_allow_html=True
                     )
-                    equity_fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
-                    equity_fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
-                    
-                    st.plotly_chart(equity_fig, use_container_width=True)
-                    
-                    st.markdown("#### 📍 Trade Signals on Price Chart")
-                    
-                    signals_fig = go.Figure()
-                    signals_fig.add_trace(go.Scatter(
-                        x=bt_data.index,
-                        y=bt_data[close_col],
-                        mode='lines',
-                        name='Price',
-                        line=dict(color='#667eea', width=2)
-                    ))
-                    
-                    buy_signals = bt_data[bt_data['Signal'].diff() == 1]
-                    signals_fig.add_trace(go.Scatter(
-                        x=buy_signals.index,
-                        y=buy_signals[close_col],
-                        mode='markers',
-                        name='Buy',
-                        marker=dict(color='#10b981', size=12, symbol='triangle-up')
-                    ))
-                    
-                    sell_signals = bt_data[bt_data['Signal'].diff() == -1]
-                    signals_fig.add_trace(go.Scatter(
-                        x=sell_signals.index,
-                        y=sell_signals[close_col],
-                        mode='markers',
-                        name='Sell',
-                        marker=dict(color='#ef4444', size=12, symbol='triangle-down')
-                    ))
                     
-                    signals_fig.update_layout(
-                        height=400,
-                        template='plotly_dark',
-                        hovermode='x unified',
-                        showlegend=True,
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                        margin=dict(l=50, r=50, t=30, b=30),
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        yaxis_title="Price ($)"
-                    )
-                    signals_fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
-                    signals_fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128, 128, 128, 0.2)')
+                    st.markdown("<br>", unsafe_allow_html=True)
                     
-                    st.plotly_chart(signals_fig, use_container_width=True)
+                    # Figures are only built and sent once asked for; the metrics above need neither
+                    if st.toggle("📈 Show equity curve & trade signals", key='show_backtest_charts'):
+                        equity_fig = build_equity_fig(bt_index, equity)
+                        st.plotly_chart(equity_fig, use_container_width=True)
+                        
+                        st.markdown("#### 📍 Trade Signals on Price Chart")
+                        
+                        signals_fig = build_signals_fig(bt_index, bt_close, bt['buy_idx'], bt['sell_idx'])
+                        st.plotly_chart(signals_fig, use_container_width=True)
                 else:
                     st.warning("Not enough data to run backtest with selected parameters.")
     
@@ -1035,49 +1373,19 @@ if st.session_state['stock_data'] is not None:
         if st.button("📊 Download Full Report (PDF)", use_container_width=True):
             if st.session_state.get('ai_analysis'):
                 try:
-                    doc = SimpleDocTemplate("stock_analysis_report.pdf", pagesize=letter)
-                    styles = getSampleStyleSheet()
-                    
-                    title_style = ParagraphStyle(
-                        'CustomTitle',
-                        parent=styles['Heading1'],
-                        fontSize=24,
-                        textColor='#667eea',
-                        spaceAfter=30,
-                        alignment=TA_CENTER
+                    generated = datetime.now()
+                    pdf_bytes = export_pdf_report(
+                        ticker, start_date, end_date,
+                        current_price, price_change, price_change_pct, high_52w, low_52w,
+                        st.session_state['ai_analysis'], generated
+                    )
+                    st.download_button(
+                        "📥 Download PDF",
+                        pdf_bytes,
+                        file_name=f"{ticker}_analysis_{generated.strftime('%Y%m%d')}.pdf",
+                        mime="application/pdf",
+                        use_container_width=True
                     )
-                    
-                    content = []
-                    content.append(Paragraph(f"Stock Analysis Report: {ticker}", title_style))
-                    content.append(Spacer(1, 12))
-                    content.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-                    content.append(Spacer(1, 12))
-                    content.append(Paragraph(f"Date Range: {start_date} to {end_date}", styles['Normal']))
-                    content.append(Spacer(1, 24))
-                    
-                    content.append(Paragraph("Key Metrics", styles['Heading2']))
-                    content.append(Paragraph(f"Current Price: ${current_price:.2f}", styles['Normal']))
-                    content.append(Paragraph(f"Price Change: {price_change:+.2f} ({price_change_pct:+.2f}%)", styles['Normal']))
-                    content.append(Paragraph(f"52-Week High: ${high_52w:.2f}", styles['Normal']))
-                    content.append(Paragraph(f"52-Week Low: ${low_52w:.2f}", styles['Normal']))
-                    content.append(Spacer(1, 24))
-                    
-                    content.append(Paragraph("AI Analysis", styles['Heading2']))
-                    analysis_text = st.session_state['ai_analysis'].replace('\n', '<br/>')
-                    content.append(Paragraph(analysis_text, styles['Normal']))
-                    
-                    doc.build(content)
-                    
-                    with open("stock_analysis_report.pdf", "rb") as pdf_file:
-                        st.download_button(
-                            "📥 Download PDF",
-                            pdf_file,
-                            file_name=f"{ticker}_analysis_{datetime.now().strftime('%Y%m%d')}.pdf",
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
-                    
-                    os.remove("stock_analysis_report.pdf")
                 except Exception as e:
                     st.error(f"Error generating PDF: {str(e)}")
             else:
@@ -1085,12 +1393,11 @@ if st.session_state['stock_data'] is not None:
     
     with export_col2:
         if st.button("📈 Download Data (CSV)", use_container_width=True):
-            csv = data.to_csv()
             st.download_button(
                 "📥 Download CSV",
-                csv,
-                file_name=f"{ticker}_data_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv",
+                export_csv_gz(data),
+                file_name=f"{ticker}_data_{datetime.now().strftime('%Y%m%d')}.csv.gz",
+                mime="application/gzip",
                 use_container_width=True
             )
     
@@ -1098,31 +1405,7 @@ if st.session_state['stock_data'] is not None:
         st.info("💡 Generate AI analysis to unlock PDF reports!")
 
 else:
-    st.markdown("""
-    <div style="text-align: center; padding: 4rem 2rem;">
-        <h2 style="color: #667eea; margin-bottom: 1rem;">👋 Welcome to Stock Analysis Pro</h2>
-        <p style="font-size: 1.2rem; color: rgba(255,255,255,0.7); margin-bottom: 2rem;">
-            Get started by entering a stock ticker and fetching data from the sidebar
-        </p>
-        <div style="display: flex; justify-content: center; gap: 2rem; margin-top: 3rem;">
-            <div style="background: rgba(102, 126, 234, 0.1); padding: 2rem; border-radius: 12px; max-width: 300px;">
-                <div style="font-size: 3rem; margin-bottom: 1rem;">📈</div>
-                <h3 style="color: #667eea;">Advanced Charts</h3>
-                <p style="color: rgba(255,255,255,0.6)">Interactive candlestick charts with multiple technical indicators</p>
-            </div>
-            <div style="background: rgba(102, 126, 234, 0.1); padding: 2rem; border-radius: 12px; max-width: 300px;">
-                <div style="font-size: 3rem; margin-bottom: 1rem;">🤖</div>
-                <h3 style="color: #667eea;">AI Analysis</h3>
-                <p style="color: rgba(255,255,255,0.6)">Get intelligent insights powered by Llama Vision AI</p>
-            </div>
-            <div style="background: rgba(102, 126, 234, 0.1); padding: 2rem; border-radius: 12px; max-width: 300px;">
-                <div style="font-size: 3rem; margin-bottom: 1rem;">⚡</div>
-                <h3 style="color: #667eea;">Backtesting</h3>
-                <p style="color: rgba(255,255,255,0.6)">Test trading strategies with historical data</p>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_WELCOME_HTML, unsafe_allow_html=True)
 
 st.markdown("---")
 st.markdown("""